@@ -0,0 +1,176 @@
+# Author: shen weijie
+# Date: 2025-09-05
+# Description: 商品数据预聚合（按关键词、抓取日期、省份、店铺汇总）
+#----------------------
+import os
+import pandas as pd
+
+# 聚合维度，数据中缺少的维度统一填充为"未知"
+DIMENSIONS = ['关键词', '抓取日期', '省份', '店铺名称']
+
+# 聚合结果版本号，结构变化时递增以使旧缓存失效
+CUBE_VERSION = 1
+
+
+def cube_file_path(data_file):
+    """聚合结果保存在数据文件旁边，例如 fetch_taobao_2025.xlsx -> fetch_taobao_2025.agg.pkl"""
+    base, _ = os.path.splitext(data_file)
+    return f'{base}.agg.pkl'
+
+
+def _fill_dimensions(df):
+    """补齐缺失的维度列"""
+    dims = pd.DataFrame(index=df.index)
+    for dim in DIMENSIONS:
+        dims[dim] = df[dim].astype(str) if dim in df.columns else '未知'
+    return dims
+
+
+def _rows_hash(df):
+    """计算数据行的哈希，用于判断新数据是否只是在旧数据后追加"""
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+def build_cubes(df):
+    """
+    对清洗后的数据做一次全量聚合。
+    :param df: 已清洗的数据（价格、交易数量为数值，含省份列）
+    :return: 聚合结果字典
+    """
+    dims = _fill_dimensions(df)
+    facts = dims.assign(商品数=1, 价格合计=df['价格'], 交易数量合计=df['交易数量'])
+    cube = facts.groupby(DIMENSIONS, dropna=False).sum().reset_index()
+
+    return {
+        'version': CUBE_VERSION,
+        'n_rows': len(df),
+        'rows_hash': _rows_hash(df),
+        'cube': cube,
+        # 价格和交易数量的取值频数表，可增量合并并精确还原 describe()
+        'price_counts': df['价格'].value_counts(),
+        'sales_counts': df['交易数量'].value_counts(),
+    }
+
+
+def update_cubes(cubes, new_df, full_df=None):
+    """
+    将新增的数据行合并到已有聚合结果中，无需重新扫描全部数据。
+    :param cubes: 已有聚合结果
+    :param new_df: 新增的数据行（已清洗）
+    :param full_df: 合并后的完整数据，用于更新行哈希；为空时仅更新行数
+    :return: 更新后的聚合结果
+    """
+    if len(new_df) == 0:
+        return cubes
+
+    delta = build_cubes(new_df)
+    cube = pd.concat([cubes['cube'], delta['cube']], ignore_index=True)
+    cube = cube.groupby(DIMENSIONS, dropna=False).sum().reset_index()
+
+    return {
+        'version': CUBE_VERSION,
+        'n_rows': cubes['n_rows'] + len(new_df),
+        'rows_hash': _rows_hash(full_df) if full_df is not None else None,
+        'cube': cube,
+        'price_counts': cubes['price_counts'].add(delta['price_counts'], fill_value=0).astype(int),
+        'sales_counts': cubes['sales_counts'].add(delta['sales_counts'], fill_value=0).astype(int),
+    }
+
+
+def load_cubes(df, data_file):
+    """
+    读取数据文件旁保存的聚合结果，按需增量更新或全量重建，并写回磁盘。
+    :param df: 已清洗的完整数据
+    :param data_file: 数据文件路径
+    :return: 聚合结果字典
+    """
+    cube_file = cube_file_path(data_file)
+    cubes = None
+    if os.path.exists(cube_file):
+        try:
+            cubes = pd.read_pickle(cube_file)
+        except Exception as e:
+            print(f'聚合结果读取失败，重新计算: {str(e)}')
+
+    if cubes is not None and cubes.get('version') == CUBE_VERSION:
+        n_rows = cubes['n_rows']
+        if n_rows == len(df) and cubes['rows_hash'] == _rows_hash(df):
+            return cubes
+        # 数据只是在原有行后追加，只聚合新增部分
+        if n_rows < len(df) and cubes['rows_hash'] == _rows_hash(df.iloc[:n_rows]):
+            cubes = update_cubes(cubes, df.iloc[n_rows:], full_df=df)
+            _save_cubes(cubes, cube_file)
+            return cubes
+
+    cubes = build_cubes(df)
+    _save_cubes(cubes, cube_file)
+    return cubes
+
+
+def _save_cubes(cubes, cube_file):
+    try:
+        pd.to_pickle(cubes, cube_file)
+    except Exception as e:
+        print(f'聚合结果保存失败: {str(e)}')
+
+
+def province_counts(cubes):
+    """各省份商品数量，按数量降序"""
+    counts = cubes['cube'].groupby('省份')['商品数'].sum()
+    return counts.sort_values(ascending=False)
+
+
+def shop_stats(cubes):
+    """各店铺平均价格与总交易量"""
+    cube = cubes['cube']
+    # 与原始数据 groupby 行为一致，忽略空店铺名
+    cube = cube[cube['店铺名称'] != 'nan']
+    stats = cube.groupby('店铺名称')[['商品数', '价格合计', '交易数量合计']].sum()
+    return pd.DataFrame({
+        '价格': stats['价格合计'] / stats['商品数'],
+        '交易数量': stats['交易数量合计'],
+    }).round(2)
+
+
+def totals(cubes):
+    """商品总数、平均价格、总交易量"""
+    cube = cubes['cube']
+    count = int(cube['商品数'].sum())
+    mean_price = cube['价格合计'].sum() / count if count else float('nan')
+    return count, mean_price, cube['交易数量合计'].sum()
+
+
+def describe_counts(counts, name=None):
+    """
+    根据取值频数表计算统计信息，结果与 Series.describe() 一致。
+    :param counts: 取值 -> 出现次数
+    :param name: 结果 Series 的名称
+    """
+    counts = counts[counts > 0].sort_index()
+    values = counts.index.to_numpy(dtype=float)
+    weights = counts.to_numpy(dtype=float)
+    n = weights.sum()
+    index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    if n == 0:
+        return pd.Series([0] + [float('nan')] * 7, index=index, name=name)
+
+    mean = (values * weights).sum() / n
+    std = (((values - mean) ** 2 * weights).sum() / (n - 1)) ** 0.5 if n > 1 else float('nan')
+
+    # 线性插值求分位数（与 pandas 默认方式相同）
+    cum = weights.cumsum()
+
+    def value_at(pos):
+        return values[(cum > pos).argmax()]
+
+    def quantile(q):
+        pos = q * (n - 1)
+        lower = int(pos)
+        frac = pos - lower
+        low_value = value_at(lower)
+        if frac == 0:
+            return low_value
+        return low_value + (value_at(lower + 1) - low_value) * frac
+
+    stats = [n, mean, std, values[0], quantile(0.25), quantile(0.5), quantile(0.75), values[-1]]
+    return pd.Series(stats, index=index, name=name)
@@ -0,0 +1,78 @@
+# Author: shen weijie
+# Date: 2025-09-12
+# Description: 看板启动耗时测试，统计导入 dashboard.py 的耗时及最慢的导入模块
+# 用法: python bench_startup.py [运行次数]
+#----------------------
+import os
+import re
+import sys
+import subprocess
+import statistics
+
+# 图表库，只显示数据概览时不应被导入
+CHART_MODULES = ['matplotlib', 'seaborn', 'pyecharts']
+
+# 在新进程中导入 dashboard（不运行 main），并输出已加载的图表库，没有时输出 '-'
+IMPORT_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import dashboard
+print(time.perf_counter() - start)
+print(','.join(m for m in {modules!r} if m in sys.modules) or '-')
+'''
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_import(importtime=False):
+    """
+    在新的 Python 进程中导入 dashboard。
+    :param importtime: 是否开启 -X importtime 输出各模块导入耗时
+    :return: (导入耗时秒数, 已加载的图表库列表, importtime 输出)
+    """
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', IMPORT_SCRIPT.format(modules=CHART_MODULES)]
+    result = subprocess.run(cmd, cwd=current_directory, capture_output=True, text=True, check=True)
+    lines = result.stdout.splitlines()
+    elapsed = float(lines[-2])
+    loaded = [m for m in lines[-1].split(',') if m and m != '-']
+    return elapsed, loaded, result.stderr
+
+
+def top_imports(importtime_output, count=15):
+    """解析 -X importtime 输出，返回 dashboard 及其直接导入的模块中累计耗时最长的几个"""
+    imports = []
+    for line in importtime_output.splitlines():
+        match = re.match(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)', line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        # 只统计前两层导入（dashboard 本身及其直接导入的模块），避免子模块重复计入
+        if len(indent) <= 3:
+            imports.append((int(cumulative_us), module))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    times = []
+    loaded = []
+    for _ in range(runs):
+        elapsed, loaded, _ = run_import()
+        times.append(elapsed)
+
+    print(f'导入 dashboard 耗时（{runs}次）: 中位数 {statistics.median(times) * 1000:.1f} ms, '
+          f'最小 {min(times) * 1000:.1f} ms, 最大 {max(times) * 1000:.1f} ms')
+    print(f'启动时已加载的图表库: {", ".join(loaded) if loaded else "无"}')
+
+    _, _, importtime_output = run_import(importtime=True)
+    print('\n累计耗时最长的导入模块（dashboard 及其直接导入）:')
+    for cumulative_us, module in top_imports(importtime_output):
+        print(f'{cumulative_us / 1000:>10.1f} ms  {module}')
+
+
+if __name__ == '__main__':
+    main()
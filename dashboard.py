@@ -4,23 +4,21 @@
 #----------------------
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import numpy as np
-import re
 import os
-import time
 
-# 添加pyecharts导入
-from pyecharts.charts import Map
-from pyecharts import options as opts   
-from pyecharts.charts import Geo
-from streamlit_echarts import st_pyecharts
-from pyecharts.globals import ChartType  
+from aggregate import load_cubes, province_counts, shop_stats, totals, describe_counts
+from product import parse_price, parse_sales
 
-# 设置中文字体支持
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+# matplotlib/seaborn/pyecharts 导入较慢，在对应图表显示时才加载，
+# 只查看数据概览时不会导入（可用 bench_startup.py 查看启动耗时）
+def get_plotting():
+    """首次绘图时导入 matplotlib 和 seaborn，并设置中文字体支持"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if plt.rcParams['font.sans-serif'][:1] != ['SimHei']:
+        plt.rcParams['font.sans-serif'] = ['SimHei']
+        plt.rcParams['axes.unicode_minus'] = False
+    return plt, sns
 
 # 设置页面配置
 st.set_page_config(
@@ -31,7 +29,7 @@ st.set_page_config(
 
 # 读取Excel数据
 @st.cache_data
-def load_data(file_path):
+def load_data(file_path, data_version=None):
     df = pd.read_excel(file_path)
     # 数据清洗
     df = clean_price_data(df)
@@ -39,28 +37,27 @@ def load_data(file_path):
     df = extract_province_data(df)
     return df
 
+# 读取预聚合结果，data_version 变化时重新计算（只聚合新增行）
+@st.cache_data
+def load_aggregates(file_path, data_version=None):
+    df = load_data(file_path, data_version)
+    return load_cubes(df, file_path)
+
 def clean_price_data(df):
     """清洗价格数据"""
-    df['价格'] = df['价格'].astype(str).apply(lambda x: re.findall(r'\d+\.?\d*', x))
-    df['价格'] = df['价格'].apply(lambda x: float(x[0]) if len(x) > 0 else 0)
+    # 新版爬虫已保存数值，无需再解析文本
+    if pd.api.types.is_numeric_dtype(df['价格']):
+        df['价格'] = df['价格'].fillna(0).astype(float)
+    else:
+        df['价格'] = df['价格'].apply(parse_price)
     return df
 
 def clean_sales_data(df):
     """清洗交易数量数据"""
-    def extract_sales(sales_str):
-        sales_str = str(sales_str)
-        # 处理"万+"格式
-        if '万' in sales_str:
-            num = re.findall(r'\d+\.?\d*', sales_str)
-            if num:
-                return float(num[0]) * 10000
-        else:
-            num = re.findall(r'\d+', sales_str)
-            if num:
-                return float(num[0])
-        return 0
-    
-    df['交易数量'] = df['交易数量'].apply(extract_sales)
+    if pd.api.types.is_numeric_dtype(df['交易数量']):
+        df['交易数量'] = df['交易数量'].fillna(0).astype(float)
+    else:
+        df['交易数量'] = df['交易数量'].apply(parse_sales)
     return df
 
 def extract_province_data(df):
@@ -68,19 +65,21 @@ def extract_province_data(df):
     df['省份'] = df['店铺所在地'].astype(str).apply(lambda x: x.split()[0] if x else "未知")
     return df
 
-def display_data_overview(df):
+def display_data_overview(df, cubes):
     """显示数据概览"""
     st.header("📊 数据概览")
+    count, mean_price, total_sales = totals(cubes)
     col1, col2, col3 = st.columns(3)
-    col1.metric("商品总数", len(df))
-    col2.metric("平均价格", f"¥{df['价格'].mean():.2f}")
-    col3.metric("总交易量", int(df['交易数量'].sum()))
+    col1.metric("商品总数", count)
+    col2.metric("平均价格", f"¥{mean_price:.2f}")
+    col3.metric("总交易量", int(total_sales))
     
     st.dataframe(df.head(10), use_container_width=True)
 
 def plot_price_distribution(df):
     """绘制价格分布图"""
     st.header("💰 价格分布分析")
+    plt, sns = get_plotting()
     fig, ax = plt.subplots(figsize=(10, 6))
     sns.histplot(data=df, x='价格', bins=30, kde=True, ax=ax)
     ax.set_title('商品价格分布直方图')
@@ -91,6 +90,7 @@ def plot_price_distribution(df):
 def plot_top_sales(df):
     """绘制交易量前20商品图"""
     st.header("📈 交易数量分析")
+    plt, sns = get_plotting()
     fig, ax = plt.subplots(figsize=(10, 6))
     # 取交易量前20的商品
     top_sales = df.nlargest(20, '交易数量')
@@ -100,16 +100,17 @@ def plot_top_sales(df):
     ax.set_ylabel('商品名称')
     st.pyplot(fig)
 
-def plot_province_distribution(df):
+def plot_province_distribution(cubes):
     """绘制店铺所在地分布图（饼图）"""
     st.header("📍 店铺所在地分析")
-    province_counts = df['省份'].value_counts().head(15)
-    
+    plt, _ = get_plotting()
+    top_provinces = province_counts(cubes).head(15)
+
     # 创建饼图
     fig, ax = plt.subplots(figsize=(12, 8))
     wedges, texts, autotexts = ax.pie(
-        province_counts.values, 
-        labels=province_counts.index, 
+        top_provinces.values,
+        labels=top_provinces.index, 
         autopct='%1.1f%%',
         startangle=90,
         textprops={'fontsize': 10}
@@ -124,7 +125,7 @@ def plot_province_distribution(df):
         autotext.set_fontweight('bold')
     
     # 添加图例
-    ax.legend(wedges, province_counts.index, title="省份", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+    ax.legend(wedges, top_provinces.index, title="省份", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
     
     st.pyplot(fig)
 
@@ -168,7 +169,7 @@ def normalize_province_names(province_counts):
     
     return pd.DataFrame(normalized_data)
 
-def plot_province_map(df):
+def plot_province_map(cubes):
     """绘制店铺所在地地图
        pyecharts 地图无法显示通常是因为缺少相应的地图数据包。请确保你已经安装了 echarts-china-provinces-pypkg 包。
        可以使用以下命令安装：
@@ -178,16 +179,19 @@ def plot_province_map(df):
        pip install echarts-china-counties-pypkg
     """
     st.header("🗺️ 店铺所在地地图")
-    # 统计各省份的店铺数量
-    province_counts = df['省份'].value_counts().reset_index()
-    province_counts.columns = ['省份', '店铺数量']
-    
+    from pyecharts.charts import Map
+    from pyecharts import options as opts
+
+    # 读取各省份的店铺数量
+    counts = province_counts(cubes).reset_index()
+    counts.columns = ['省份', '店铺数量']
+
     # 规范化省份名称
-    province_counts = normalize_province_names(province_counts)
-        
+    counts = normalize_province_names(counts)
+
     # 准备地图数据
-    provinces = province_counts['省份'].tolist()
-    shop_counts = province_counts['店铺数量'].tolist()
+    provinces = counts['省份'].tolist()
+    shop_counts = counts['店铺数量'].tolist()
     
     # 获取最大值以设置 visualmap
     max_count = max(shop_counts) if shop_counts else 100
@@ -229,6 +233,7 @@ def plot_province_map(df):
 def plot_price_sales_relationship(df):
     """绘制价格与交易量关系图"""
     st.header("🔗 价格与交易量关系")
+    plt, sns = get_plotting()
     fig, ax = plt.subplots(figsize=(10, 6))
     sns.scatterplot(data=df, x='价格', y='交易数量', ax=ax)
     ax.set_title('价格与交易量散点图')
@@ -236,30 +241,27 @@ def plot_price_sales_relationship(df):
     ax.set_ylabel('交易数量')
     st.pyplot(fig)
 
-def plot_shop_analysis(df):
+def plot_shop_analysis(cubes):
     """绘制店铺分析图"""
     st.header("🏪 店铺分析")
-    shop_stats = df.groupby('店铺名称').agg({
-        '价格': 'mean',
-        '交易数量': 'sum'
-    }).round(2)
-    shop_stats = shop_stats.sort_values('交易数量', ascending=False).head(15)
-    
+    plt, sns = get_plotting()
+    top_shops = shop_stats(cubes).sort_values('交易数量', ascending=False).head(15)
+
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(x=shop_stats['交易数量'], y=shop_stats.index, ax=ax)
+    sns.barplot(x=top_shops['交易数量'], y=top_shops.index, ax=ax)
     ax.set_title('店铺总交易量排行 (前15)')
     ax.set_xlabel('总交易量')
     ax.set_ylabel('店铺名称')
     st.pyplot(fig)
 
-def display_data_statistics(df):
+def display_data_statistics(cubes):
     """显示数据统计信息"""
     st.header("📈 数据统计")
     st.subheader("价格统计")
-    st.write(df['价格'].describe())
-    
+    st.write(describe_counts(cubes['price_counts'], name='价格'))
+
     st.subheader("交易量统计")
-    st.write(df['交易数量'].describe())
+    st.write(describe_counts(cubes['sales_counts'], name='交易数量'))
 
 def display_data_filter(df):
     """显示数据筛选功能"""
@@ -303,7 +305,10 @@ def main():
     data_file = f'{current_directory}/output/fetch_taobao_2025.xlsx'    
 
     try:
-        df = load_data(data_file)
+        # 以文件修改时间作为数据版本，数据更新后重新加载
+        data_version = os.path.getmtime(data_file)
+        df = load_data(data_file, data_version)
+        cubes = load_aggregates(data_file, data_version)
     except Exception as e:
         st.error(f"数据加载失败: {e}")
         return
@@ -311,7 +316,7 @@ def main():
     # 根据侧边栏选项显示内容
     if show_data_overview:
         # 显示数据概览
-        display_data_overview(df)
+        display_data_overview(df, cubes)
     
     if show_price_analysis or show_sales_analysis:
         col1, col2 = st.columns(2)
@@ -328,9 +333,9 @@ def main():
         # 店铺所在地分析
         col3, col4 = st.columns(2)
         with col3:
-            plot_province_distribution(df)
+            plot_province_distribution(cubes)
         with col4:
-            plot_province_map(df)
+            plot_province_map(cubes)
     
     if show_relationship_analysis or show_shop_analysis:
         col5, col6 = st.columns(2)
@@ -341,14 +346,14 @@ def main():
         with col6:
             # 店铺分析
             if show_shop_analysis:
-                plot_shop_analysis(df)
+                plot_shop_analysis(cubes)
     
     if show_data_statistics or show_data_filter:
         col7, col8 = st.columns(2)
         with col7:
             # 数据统计
             if show_data_statistics:
-                display_data_statistics(df)
+                display_data_statistics(cubes)
         with col8:
             # 高级筛选
             if show_data_filter:
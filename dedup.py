@@ -0,0 +1,184 @@
+# Author: shen weijie
+# Date: 2025-09-08
+# Description: 商品去重索引（同一次运行内跨页、以及跨多次运行）
+#----------------------
+import os
+import math
+import pickle
+import hashlib
+from array import array
+from urllib.parse import urlsplit, urlunsplit, unquote
+
+# 淘宝链接中的跟踪参数，不影响商品/店铺本身
+TRACKING_PARAMS = {
+    'spm', 'scm', 'pvid', 'ns', 'abbucket', 'utparam', 'priceTId', 'xxc',
+    'mi_id', 'from', 'sourceType', 'suid', 'ali_refid', 'ali_trackid', 'trackInfo',
+}
+
+
+def _query_pairs(query):
+    """
+    按 & 拆分查询参数，返回 (参数名, 原始参数) 列表。
+    参数值不解码也不重新编码，广告跳转链接中的 GBK 编码关键词可以原样保留。
+    """
+    pairs = []
+    for pair in query.split('&'):
+        if pair:
+            pairs.append((unquote(pair.split('=', 1)[0]), pair))
+    return pairs
+
+
+def normalize_url(url):
+    """
+    去掉链接中的跟踪参数并补全协议。
+    商品链接只保留 id 参数，其他链接去掉已知的跟踪参数。
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    if url.startswith('//'):
+        url = 'https:' + url
+
+    parts = urlsplit(url)
+    pairs = _query_pairs(parts.query)
+    item_ids = [pair for key, pair in pairs if key == 'id']
+    if item_ids:
+        query = item_ids[:1]
+    else:
+        query = [pair for key, pair in pairs if key not in TRACKING_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, '&'.join(query), ''))
+
+
+def item_id(product_url):
+    """从商品链接中取出商品ID，广告跳转链接等没有ID时返回空字符串"""
+    for key, pair in _query_pairs(urlsplit(product_url or '').query):
+        if key == 'id':
+            return unquote(pair.split('=', 1)[-1])
+    return ''
+
+
+def product_key(product_url, shop_url, title=''):
+    """
+    生成去重键：优先使用商品ID，没有ID时（如广告跳转链接每次展示参数都不同）使用店铺链接加商品标题。
+    :return: 去重键，信息不足以识别商品时返回 None
+    """
+    shop_url = normalize_url(shop_url)
+    item = item_id(product_url)
+    if item:
+        return f'{item}|{shop_url}'
+    if shop_url and title:
+        return f'{shop_url}|{title.strip()}'
+    return None
+
+
+def _digest(key, size=8):
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=size).digest()
+
+
+class BloomFilter:
+    """
+    布隆过滤器，用于大规模抓取时节省内存。
+    可能把少量新商品误判为重复（概率约为 error_rate），不会漏判重复商品。
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.count = 0
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = _digest(key, 16)
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class HashSet:
+    """只保存键的64位哈希值的集合，比直接保存链接字符串节省内存"""
+
+    def __init__(self, hashes=()):
+        self.hashes = set(hashes)
+
+    def __contains__(self, key):
+        return int.from_bytes(_digest(key), 'little') in self.hashes
+
+    def add(self, key):
+        self.hashes.add(int.from_bytes(_digest(key), 'little'))
+
+    def __getstate__(self):
+        # 以紧凑的无符号64位数组保存
+        return (array('Q', self.hashes),)
+
+    def __setstate__(self, state):
+        self.hashes = set(state[0])
+
+
+class DedupIndex:
+    """
+    商品去重索引。
+    :param path: 索引保存路径，为空时只在本次运行内去重
+    :param bloom_capacity: 预计商品数量，设置后使用布隆过滤器代替哈希集合
+    :param error_rate: 布隆过滤器的误判率
+    """
+
+    def __init__(self, path=None, bloom_capacity=None, error_rate=0.001):
+        self.path = path
+        self.seen = None
+        self.over_capacity_warned = False
+        expected_type = BloomFilter if bloom_capacity else HashSet
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    self.seen = pickle.load(f)
+                print(f'已加载去重索引: {path}')
+            except Exception as e:
+                print(f'去重索引读取失败，重新创建: {str(e)}')
+        # 已保存的索引类型与当前设置不一致时无法转换，只能重新创建
+        if self.seen is not None and type(self.seen) is not expected_type:
+            print(f'去重索引类型（{type(self.seen).__name__}）与当前设置（{expected_type.__name__}）不一致，重新创建')
+            self.seen = None
+        if self.seen is None:
+            self.seen = BloomFilter(bloom_capacity, error_rate) if bloom_capacity else HashSet()
+        self._check_capacity()
+
+    def add(self, product_url, shop_url, title=''):
+        """
+        记录商品。
+        :return: 新商品返回 True，重复商品返回 False；无法识别的商品不去重，返回 True
+        """
+        key = product_key(product_url, shop_url, title)
+        if key is None:
+            return True
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self._check_capacity()
+        return True
+
+    def _check_capacity(self):
+        """布隆过滤器超过预计容量后误判率会快速上升，新商品可能被当作重复丢弃"""
+        seen = self.seen
+        if isinstance(seen, BloomFilter) and seen.count > seen.capacity and not self.over_capacity_warned:
+            print(f'警告：去重索引已记录{seen.count}个商品，超过布隆过滤器容量{seen.capacity}，'
+                  f'误判为重复的商品会增多，请调大预计数量')
+            self.over_capacity_warned = True
+
+    def save(self):
+        """保存索引，供下次运行继续去重"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'wb') as f:
+                pickle.dump(self.seen, f)
+        except Exception as e:
+            print(f'去重索引保存失败: {str(e)}')
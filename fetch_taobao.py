@@ -5,10 +5,11 @@
 import time
 import random
 import os
+import logging
 import requests
 import uuid
 from PIL import Image as PILImage
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 from openpyxl.drawing.image import Image
 from openpyxl.styles import Alignment
 from io import BytesIO
@@ -23,6 +24,11 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from bs4 import BeautifulSoup
 
+from dedup import DedupIndex, normalize_url
+from product import HEADERS, ProductRecord
+
+logger = logging.getLogger(__name__)
+
 
 # 配置常量
 MAX_WAIT_TIME = 20
@@ -139,12 +145,14 @@ def simulate_scroll(browser):
         time.sleep(SCROLL_DELAY)
         current_position = next_position
 
-def get_products(browser, page_num, ws):
+def get_products(browser, page_num, ws, dedup_index=None):
     """
     获取对应页码下的所有商品信息，并保存到 Excel 工作表中。
     :param browser: 浏览器对象
     :param page_num: 页码
     :param ws: Excel 工作表对象
+    :param dedup_index: 商品去重索引，为空时不去重
+    :return: (新增商品数, 重复丢弃数)
     """
     print(f"正在提取第{page_num}页的商品信息...")
     time.sleep(random.randint(3, 5))
@@ -158,13 +166,17 @@ def get_products(browser, page_num, ws):
     # 提取所有商品的共同父元素
     divs = soup.find_all('div', class_='tbpc-col search-content-col tbpc-col-lg-12 tbpc-col-xl-12 tbpc-col-xxl-10 tbpc-col tbpc-col-horizon-8 search-content-col tbpc-col-lg-12 tbpc-col-xl-12 tbpc-col-xxl-10')
 
+    added = 0
+    dropped = 0
+
     for div in divs:
         # 查找并获取需要的相关信息, 并进行空值检查
         product_url_tag = div.find('a', class_='doubleCardWrapperAdapt--mEcC7olq')
         if not product_url_tag:
             print(f"警告：未找到商品链接元素，跳过此商品")
             continue
-        product_url = product_url_tag.attrs.get('href', '')
+        # 去掉跟踪参数，同一商品在不同页出现时链接一致
+        product_url = normalize_url(product_url_tag.attrs.get('href', ''))
         
         image_tag = div.find('img', class_='mainImg--sPh_U37m')
         image_url = image_tag.attrs.get('src', '') if image_tag else ''
@@ -182,52 +194,51 @@ def get_products(browser, page_num, ws):
         shop_name = shop_name_tag.text if shop_name_tag else ''
         
         shop_url_tag = div.find('a', class_='shopName--hdF527QA')
-        shop_url = shop_url_tag.attrs.get('href', '') if shop_url_tag else ''
+        shop_url = normalize_url(shop_url_tag.attrs.get('href', '')) if shop_url_tag else ''
+
+        # 广告、重新排序会让同一商品在多页重复出现，跳过已记录的商品
+        if dedup_index is not None and not dedup_index.add(product_url, shop_url, title):
+            dropped += 1
+            continue
         
         location_tag = div.find('div', class_='procity--wlcT2xH9')
         location = location_tag.text if location_tag else ''
 
-        product = {
-            '商品图片': image_url,
-            '商品网址': product_url,
-            '价格': price,
-            '商品简介': title,
-            '交易数量': deal,
-            '店铺名称': shop_name,
-            '店铺网址': shop_url,
-            '店铺所在地': location
-        }
+        # 价格和交易数量在提取时解析为数值
+        product = ProductRecord.from_text(image_url, product_url, price, title, deal, shop_name, shop_url, location)
+
+        logger.debug('%r', product)
+
+        added += 1
+        # 下载图片并插入Excel
+        img_path = download_image(product.image_url)
 
-        print(f'{product}')
-
-        if product:
-            # 下载图片并插入Excel
-            img_path = download_image(product['商品图片'])
-            
-            # 先添加数据行（图片列留空）
-            current_row = ws.max_row + 1
-            ws.append(['', product['商品网址'], product['价格'], product['商品简介'], product['交易数量'], product['店铺名称'], product['店铺网址'], product['店铺所在地']])
-            
-            # 插入图片到A列
-            if img_path:
-                img = Image(img_path)
-                # 调整图片大小
-                img.width = 100
-                img.height = 100
-                # 插入图片到当前行A列
-                ws.add_image(img, f'A{current_row}')
-                # 调整行高适应图片
-                ws.row_dimensions[current_row].height = 80
-        else:
-            print("没有找到商品")
-
-
-def page_turning(browser, page_num, ws):
+        # 先添加数据行（图片列留空）
+        current_row = ws.max_row + 1
+        ws.append(product.to_row())
+        
+        # 插入图片到A列
+        if img_path:
+            img = Image(img_path)
+            # 调整图片大小
+            img.width = 100
+            img.height = 100
+            # 插入图片到当前行A列
+            ws.add_image(img, f'A{current_row}')
+            # 调整行高适应图片
+            ws.row_dimensions[current_row].height = 80
+
+    print(f'第{page_num}页：新增{added}条商品，丢弃重复商品{dropped}条')
+    return added, dropped
+
+
+def page_turning(browser, page_num, ws, dedup_index=None):
     """
     跳转到指定页码并获取该页商品信息。
     :param browser: 浏览器对象
     :param page_num: 目标页码
     :param ws: Excel 工作表对象
+    :param dedup_index: 商品去重索引
     """
     print(f'正在跳转至第{page_num}页')
     try:
@@ -256,13 +267,13 @@ def page_turning(browser, page_num, ws):
 
         print("跳转页面成功")
 
-        get_products(browser, page_num, ws)
+        get_products(browser, page_num, ws, dedup_index)
 
     except TimeoutException:
         print(f"跳转超时，重新跳转，当前页码：{page_num}")
-        page_turning(browser, page_num, ws)
+        page_turning(browser, page_num, ws, dedup_index)
 
-def fetch_goods(browser, start_page, total_pages, ws, url, excel_file_name, keyword):
+def fetch_goods(browser, start_page, total_pages, ws, url, excel_file_name, keyword, dedup_index=None):
     """
     搜索商品并抓取指定页码范围的商品信息。
     :param browser: 浏览器对象
@@ -272,6 +283,7 @@ def fetch_goods(browser, start_page, total_pages, ws, url, excel_file_name, keyw
     :param url: 搜索页面的 URL
     :param excel_file_name: 保存数据的 Excel 文件名
     :param keyword: 搜索关键词
+    :param dedup_index: 商品去重索引
     """
     print(f'正在爬取第{start_page}页')
     
@@ -317,17 +329,21 @@ def fetch_goods(browser, start_page, total_pages, ws, url, excel_file_name, keyw
             wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="search-content-leftWrap"]/div[3]/div[4]/div/div/span[3]/input')))
 
         # 获取起始页商品信息
-        get_products(browser, start_page, ws)
+        get_products(browser, start_page, ws, dedup_index)
 
         # 保存当前页数据
         ws.parent.save(excel_file_name)
+        if dedup_index is not None:
+            dedup_index.save()
 
         # 遍历后续页码并跳转获取商品信息
         for i in range(start_page + 1, start_page + total_pages):
-            page_turning(browser, i, ws)
+            page_turning(browser, i, ws, dedup_index)
 
             # 每页完成后保存
-            ws.parent.save(excel_file_name)            
+            ws.parent.save(excel_file_name)
+            if dedup_index is not None:
+                dedup_index.save()            
 
         print(f'已完成第{start_page}页到第{start_page + total_pages}页的商品信息获取')
 
@@ -337,6 +353,9 @@ def fetch_goods(browser, start_page, total_pages, ws, url, excel_file_name, keyw
 
 
 if __name__ == '__main__':
+    # 需要查看每个商品的提取结果时改为 logging.DEBUG
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
     #查的页面数量
     page_start = 1
     page_all = 10
@@ -352,37 +371,56 @@ if __name__ == '__main__':
     # 获取脚本所在的目录
     current_directory = os.path.dirname(script_path)    
     #保存文件名
-    excel_file = f'{current_directory}/output/fetch_taobao_2025.xlsx'      
-    
-    # 初始化浏览器
-    browser = init_browser()
-
-    # 创建 Excel 工作簿和工作表
-    wb = Workbook()
-    ws = wb.active
+    excel_file = f'{current_directory}/output/fetch_taobao_2025.xlsx'
 
-    #设置工作表的列宽，并设置标题
-    ws.column_dimensions['A'].width = 15
-    ws.column_dimensions['B'].width = 20
-    ws.column_dimensions['C'].width = 5
-    ws.column_dimensions['D'].width = 20
-    ws.column_dimensions['E'].width = 5
-    ws.column_dimensions['F'].width = 10
-    ws.column_dimensions['G'].width = 100
-    ws.column_dimensions['H'].width = 10
+    # 商品去重索引：默认只在本次运行内去重；
+    # 设置保存路径后跨次运行去重，此时新数据追加写入已有的 Excel 文件
+    dedup_file = None  # f'{current_directory}/output/fetch_taobao_2025.seen'
+    # 预计抓取的商品很多时，设置预计数量改用布隆过滤器以节省内存
+    dedup_capacity = None  # 例如 1000000
 
-    # 设置自动换行
-    wrap_alignment = Alignment(wrap_text=True)
+    append_mode = dedup_file is not None and os.path.exists(excel_file)
+    if dedup_file and not append_mode and os.path.exists(dedup_file):
+        # Excel 文件不存在时，旧索引中的商品已不在数据里，不能再用来去重
+        print(f'未找到数据文件 {excel_file}，删除旧的去重索引')
+        os.remove(dedup_file)
+    dedup_index = DedupIndex(dedup_file, bloom_capacity=dedup_capacity)
 
-    # 为需要自动换行的列设置格式
-    for row in ws.iter_rows():
-        for cell in row:
-            cell.alignment = wrap_alignment
+    # 初始化浏览器
+    browser = init_browser()
 
-    ws.append(['商品图片', '商品网址', '价格', '商品简介', '交易数量', '店铺名称', '店铺网址', '店铺所在地'])
+    if append_mode:
+        # 跨次运行去重时在已有数据后追加，保留之前运行抓取的商品
+        wb = load_workbook(excel_file)
+        ws = wb.active
+        print(f'追加写入已有数据文件: {excel_file}')
+    else:
+        # 创建 Excel 工作簿和工作表
+        wb = Workbook()
+        ws = wb.active
+
+        #设置工作表的列宽，并设置标题
+        ws.column_dimensions['A'].width = 15
+        ws.column_dimensions['B'].width = 20
+        ws.column_dimensions['C'].width = 5
+        ws.column_dimensions['D'].width = 20
+        ws.column_dimensions['E'].width = 5
+        ws.column_dimensions['F'].width = 10
+        ws.column_dimensions['G'].width = 100
+        ws.column_dimensions['H'].width = 10
+
+        # 设置自动换行
+        wrap_alignment = Alignment(wrap_text=True)
+
+        # 为需要自动换行的列设置格式
+        for row in ws.iter_rows():
+            for cell in row:
+                cell.alignment = wrap_alignment
+
+        ws.append(HEADERS)
 
     # 开始搜索商品并抓取数据
-    fetch_goods(browser, page_start, page_all, ws, base_url, excel_file,keyword)     
+    fetch_goods(browser, page_start, page_all, ws, base_url, excel_file, keyword, dedup_index)     
 
     # 关闭浏览器
     #browser.quit()
\ No newline at end of file
@@ -0,0 +1,64 @@
+# Author: shen weijie
+# Date: 2025-09-10
+# Description: 商品记录及价格、交易数量解析
+#----------------------
+import re
+
+# Excel 表头，与 ProductRecord.to_row() 的列顺序一致
+HEADERS = ['商品图片', '商品网址', '价格', '商品简介', '交易数量', '店铺名称', '店铺网址', '店铺所在地']
+
+_NUMBER_RE = re.compile(r'\d+\.?\d*')
+_INT_RE = re.compile(r'\d+')
+
+
+def parse_price(price_str):
+    """解析价格文本，如 '¥29.9' -> 29.9，无法解析时返回 0"""
+    num = _NUMBER_RE.search(str(price_str))
+    return float(num.group()) if num else 0.0
+
+
+def parse_sales(sales_str):
+    """解析交易数量文本，如 '1万+人付款' -> 10000.0，'200+人付款' -> 200.0"""
+    sales_str = str(sales_str)
+    # 处理"万+"格式
+    if '万' in sales_str:
+        num = _NUMBER_RE.search(sales_str)
+        if num:
+            return float(num.group()) * 10000
+    else:
+        num = _INT_RE.search(sales_str)
+        if num:
+            return float(num.group())
+    return 0.0
+
+
+class ProductRecord:
+    """
+    单个商品的信息，价格和交易数量在提取时即解析为数值。
+    使用 __slots__ 减少每个商品的内存占用。
+    """
+    __slots__ = ('image_url', 'product_url', 'price', 'title', 'sales', 'shop_name', 'shop_url', 'location')
+
+    def __init__(self, image_url, product_url, price, title, sales, shop_name, shop_url, location):
+        self.image_url = image_url
+        self.product_url = product_url
+        self.price = price
+        self.title = title
+        self.sales = sales
+        self.shop_name = shop_name
+        self.shop_url = shop_url
+        self.location = location
+
+    @classmethod
+    def from_text(cls, image_url, product_url, price_text, title, sales_text, shop_name, shop_url, location):
+        """由页面上的原始文本创建商品记录"""
+        return cls(image_url, product_url, parse_price(price_text), title, parse_sales(sales_text),
+                   shop_name, shop_url, location)
+
+    def to_row(self):
+        """转换为 Excel 行，图片列留空（图片单独插入）"""
+        return ['', self.product_url, self.price, self.title, self.sales, self.shop_name, self.shop_url, self.location]
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'ProductRecord({fields})'